@@ -14,7 +14,7 @@ use crate::db::{pool_from_settings, spawn_pool_periodic_reporter, DbPool};
 use crate::error::ApiError;
 use crate::server::metrics::Metrics;
 use crate::settings::{Deadman, Secrets, ServerLimits, Settings};
-use crate::tokenserver::{self, OAuthVerifier, VerifyToken};
+use crate::tokenserver::{self, db::models::TokenserverPool, OAuthVerifier, VerifyToken};
 use crate::web::{handlers, middleware};
 
 pub const BSO_ID_REGEX: &str = r"[ -~]{1,64}";
@@ -43,7 +43,7 @@ pub struct ServerState {
 
     // TODO: These will eventually be added as settings passed to a more mature
     // database adapter (which will be added in #1054)
-    pub tokenserver_database_url: Option<String>,
+    pub tokenserver_database_pool: Option<TokenserverPool>,
     pub fxa_metrics_hash_secret: Option<String>, // SYNC_FXA_METRICS_HASH_SECRET
 
     pub tokenserver_oauth_verifier: Box<dyn VerifyToken>,
@@ -176,13 +176,13 @@ impl Server {
     pub async fn with_settings(settings: Settings) -> Result<dev::Server, ApiError> {
         let metrics = metrics::metrics_from_opts(&settings)?;
         let db_pool = pool_from_settings(&settings, &Metrics::from(&metrics)).await?;
+        let tokenserver_database_pool = tokenserver::db::models::pool_from_settings(&settings);
         let limits = Arc::new(settings.limits);
         let limits_json =
             serde_json::to_string(&*limits).expect("ServerLimits failed to serialize");
         let secrets = Arc::new(settings.master_secret);
         let host = settings.host.clone();
         let port = settings.port;
-        let tokenserver_database_url = Arc::new(settings.tokenserver_database_url.clone());
         let fxa_oauth_server_url = settings.fxa_oauth_server_url;
         let fxa_metrics_hash_secret = Arc::new(settings.fxa_metrics_hash_secret.clone());
         let quota_enabled = settings.enable_quota;
@@ -201,7 +201,7 @@ impl Server {
                 limits: Arc::clone(&limits),
                 limits_json: limits_json.clone(),
                 secrets: Arc::clone(&secrets),
-                tokenserver_database_url: (*tokenserver_database_url).clone(),
+                tokenserver_database_pool: tokenserver_database_pool.clone(),
                 fxa_metrics_hash_secret: (*fxa_metrics_hash_secret).clone(),
                 tokenserver_oauth_verifier: Box::new(OAuthVerifier {
                     fxa_oauth_server_url: fxa_oauth_server_url.clone(),
@@ -70,7 +70,7 @@ async fn get_test_state(settings: &Settings) -> ServerState {
         limits: Arc::clone(&SERVER_LIMITS),
         limits_json: serde_json::to_string(&**SERVER_LIMITS).unwrap(),
         secrets: Arc::clone(&SECRETS),
-        tokenserver_database_url: None,
+        tokenserver_database_pool: None,
         fxa_metrics_hash_secret: None,
         tokenserver_oauth_verifier: Box::new(MockOAuthVerifier::default()),
         metrics: Box::new(metrics),
@@ -47,6 +47,13 @@ pub struct Settings {
     pub host: String,
     pub database_url: String,
     pub tokenserver_database_url: Option<String>,
+    /// Max number of connections to the Tokenserver database. Kept separate from
+    /// database_pool_max_size, which is sized for the syncstorage backend.
+    pub tokenserver_database_pool_max_size: Option<u32>,
+    /// Number of idle connections kept open to the Tokenserver database
+    pub tokenserver_database_pool_min_idle: Option<u32>,
+    /// Tokenserver pool timeout when waiting for a connection, in seconds
+    pub tokenserver_database_pool_connection_timeout: Option<u32>,
     pub database_pool_max_size: Option<u32>,
     // NOTE: Not supported by deadpool!
     pub database_pool_min_idle: Option<u32>,
@@ -93,6 +100,9 @@ impl Default for Settings {
             host: "127.0.0.1".to_string(),
             database_url: "mysql://root@127.0.0.1/syncstorage".to_string(),
             tokenserver_database_url: None,
+            tokenserver_database_pool_max_size: None,
+            tokenserver_database_pool_min_idle: None,
+            tokenserver_database_pool_connection_timeout: None,
             database_pool_max_size: None,
             database_pool_min_idle: None,
             database_pool_connection_lifespan: None,
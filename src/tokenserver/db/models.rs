@@ -1,37 +1,61 @@
+use std::time::Duration;
+
 use diesel::mysql::MysqlConnection;
+use diesel::r2d2::{ConnectionManager, Pool};
 use diesel::sql_types::Text;
-use diesel::{Connection, RunQueryDsl};
+use diesel::RunQueryDsl;
 
 use super::results::GetTokenserverUser;
 use crate::db::error::{DbError, DbErrorKind};
+use crate::settings::Settings;
+
+pub type TokenserverPool = Pool<ConnectionManager<MysqlConnection>>;
+
+/// Creates a pool of connections to the Tokenserver database, if one is configured.
+///
+/// The pool is sized by its own settings rather than the syncstorage ones. Its connection timeout
+/// is separate too, since checkouts block an actix worker while waiting. Unless
+/// tokenserver_database_pool_min_idle is set, no idle connections are kept open, so nothing
+/// connects to the Tokenserver database until the first request needs it. r2d2 checks each
+/// connection's health on checkout and recycles connections after 30 minutes.
+pub fn pool_from_settings(settings: &Settings) -> Option<TokenserverPool> {
+    settings.tokenserver_database_url.as_ref().map(|url| {
+        Pool::builder()
+            .max_size(settings.tokenserver_database_pool_max_size.unwrap_or(10))
+            .connection_timeout(Duration::from_secs(
+                settings
+                    .tokenserver_database_pool_connection_timeout
+                    .unwrap_or(30) as u64,
+            ))
+            .min_idle(Some(
+                settings.tokenserver_database_pool_min_idle.unwrap_or(0),
+            ))
+            .build_unchecked(ConnectionManager::new(url.clone()))
+    })
+}
 
-// TODO: Connecting to the database like this is only temporary. In #1054, we
-// will add a more mature database adapter for Tokenserver.
+// TODO: This is only temporary. In #1054, we will add a more mature database adapter for
+// Tokenserver.
 pub fn get_tokenserver_user_sync(
     email: &str,
-    database_url: &str,
+    pool: &TokenserverPool,
 ) -> Result<GetTokenserverUser, DbError> {
-    let connection = MysqlConnection::establish(database_url)
-        .unwrap_or_else(|_| panic!("Error connecting to {}", database_url));
+    let connection = pool.get()?;
 
-    let mut user_records = diesel::sql_query(
+    diesel::sql_query(
         r#"
         SELECT users.uid, users.email, users.client_state, users.generation,
             users.keys_changed_at, users.created_at, nodes.node
         FROM users
         JOIN nodes ON nodes.id = users.nodeid
         WHERE users.email = ?
+        ORDER BY users.generation, users.created_at
+        LIMIT 1
     "#,
     )
     .bind::<Text, _>(&email)
-    .load::<GetTokenserverUser>(&connection)?;
-
-    if user_records.is_empty() {
-        return Err(DbErrorKind::TokenserverUserNotFound.into());
-    }
-
-    user_records.sort_by_key(|user_record| (user_record.generation, user_record.created_at));
-    let user_record = user_records[0].clone();
-
-    Ok(user_record)
+    .load::<GetTokenserverUser>(&connection)?
+    .into_iter()
+    .next()
+    .ok_or_else(|| DbErrorKind::TokenserverUserNotFound.into())
 }
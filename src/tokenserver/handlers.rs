@@ -38,11 +38,11 @@ pub async fn get_tokenserver_result(
         .ok_or_else(|| internal_error("Could not load the app state"))?;
     let user_email = format!("{}@{}", tokenserver_request.fxa_uid, FXA_EMAIL_DOMAIN);
     let tokenserver_user = {
-        let database_url = state
-            .tokenserver_database_url
-            .clone()
+        let database_pool = state
+            .tokenserver_database_pool
+            .as_ref()
             .ok_or_else(|| internal_error("Could not load the app state"))?;
-        get_tokenserver_user_sync(&user_email, &database_url).map_err(ApiError::from)?
+        get_tokenserver_user_sync(&user_email, database_pool).map_err(ApiError::from)?
     };
 
     let fxa_metrics_hash_secret = state
@@ -1,5 +1,6 @@
 use actix_web::Error;
-use pyo3::prelude::{IntoPy, PyAny, PyErr, PyModule, PyObject, Python};
+use pyo3::once_cell::GILOnceCell;
+use pyo3::prelude::{IntoPy, Py, PyAny, PyErr, PyModule, PyObject, PyResult, Python};
 use pyo3::types::{IntoPyDict, PyString};
 use serde::Deserialize;
 
@@ -96,6 +97,28 @@ pub struct OAuthVerifier {
 
 impl OAuthVerifier {
     const FILENAME: &'static str = "verify.py";
+
+    /// Returns the `verify.py` module, compiling it the first time it's needed. The module is
+    /// kept for the life of the process so the FxA clients it caches (along with their pooled
+    /// HTTP connections) are reused across requests.
+    fn verify_module(py: Python<'_>) -> PyResult<&PyModule> {
+        static VERIFY_MODULE: GILOnceCell<Py<PyModule>> = GILOnceCell::new();
+
+        if let Some(module) = VERIFY_MODULE.get(py) {
+            return Ok(module.as_ref(py));
+        }
+
+        let code = include_str!("verify.py");
+        let module = PyModule::from_code(py, code, Self::FILENAME, Self::FILENAME)?;
+        // Another thread may have initialized the cell while this one was compiling the module;
+        // either copy works, so the result of `set` is ignored.
+        let _ = VERIFY_MODULE.set(py, module.into());
+
+        Ok(VERIFY_MODULE
+            .get(py)
+            .expect("verify.py module was just initialized")
+            .as_ref(py))
+    }
 }
 
 impl VerifyToken for OAuthVerifier {
@@ -103,8 +126,7 @@ impl VerifyToken for OAuthVerifier {
     /// tokens.
     fn verify_token(&self, token: &str) -> Result<TokenData, Error> {
         let maybe_token_data_string = Python::with_gil(|py| {
-            let code = include_str!("verify.py");
-            let module = PyModule::from_code(py, code, Self::FILENAME, Self::FILENAME)?;
+            let module = Self::verify_module(py)?;
             let kwargs = self
                 .fxa_oauth_server_url
                 .clone()
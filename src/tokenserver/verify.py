@@ -2,9 +2,18 @@ from fxa.oauth import Client
 from fxa.errors import ClientError, TrustError
 import json
 
+# Clients are kept for the life of the process, keyed by server URL, so that
+# each one's HTTP session (and its pooled keep-alive connections to the FxA
+# OAuth server) is reused across requests. PyFxA's verification cache is
+# disabled so that every token is still verified on every request, as it was
+# when a new Client was built per call.
+_CLIENTS = {}
+
 
 def verify_token(token, server_url=None):
-    client = Client(server_url=server_url)
+    client = _CLIENTS.get(server_url)
+    if client is None:
+        client = _CLIENTS[server_url] = Client(server_url=server_url, cache=False)
 
     try:
         token_data = client.verify_token(token)
@@ -1722,7 +1722,7 @@ mod tests {
             limits: Arc::clone(&SERVER_LIMITS),
             limits_json: serde_json::to_string(&**SERVER_LIMITS).unwrap(),
             secrets: Arc::clone(&SECRETS),
-            tokenserver_database_url: None,
+            tokenserver_database_pool: None,
             fxa_metrics_hash_secret: None,
             tokenserver_oauth_verifier: Box::new(MockOAuthVerifier::default()),
             port: 8000,
@@ -99,10 +99,9 @@ def create_token(args):
 def metrics_hash(args, value):
     if isinstance(args.hmac_key, str):
         args.hmac_key = args.hmac_key.encode()
-    hasher = hmac.new(args.hmac_key, b'', sha256)
     # value may be an email address, in which case we only want the first part
-    hasher.update(value.encode('utf-8').split(b"@", 1)[0])
-    return hasher.hexdigest()
+    return hmac.digest(
+        args.hmac_key, value.encode('utf-8').split(b"@", 1)[0], sha256).hex()
 
 
 def main():
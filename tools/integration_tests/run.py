@@ -4,17 +4,60 @@ import atexit
 import os.path
 import subprocess
 import sys
+from urllib.parse import urlparse
+
+import requests
 from test_storage import TestStorage
-from test_support import run_live_functional_tests
+from test_support import get_option_parser, run_live_functional_tests
 import time
 
 
 DEBUG_BUILD = 'target/debug/syncstorage'
 RELEASE_BUILD = '/app/bin/syncstorage'
+DEFAULT_URL = 'http://localhost:8000'
+# Maximum number of seconds to wait for the server to start answering
+STARTUP_TIMEOUT = 60
+
+
+def wait_for_server(process, url, timeout=STARTUP_TIMEOUT):
+    """Poll the server's load balancer heartbeat until it responds.
+
+    Polling starts quickly and backs off to once a second, so the tests
+    begin as soon as the server is up rather than after a fixed delay.
+    """
+    heartbeat = urlparse(url)._replace(
+        path='/__lbheartbeat__', query='', fragment='').geturl()
+    deadline = time.time() + timeout
+    delay = 0.05
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(
+                "syncstorage exited with status {}".format(process.returncode))
+        try:
+            if requests.get(heartbeat, timeout=1).status_code == 200:
+                return
+        except (requests.exceptions.MissingSchema,
+                requests.exceptions.InvalidSchema,
+                requests.exceptions.InvalidURL):
+            # A malformed URL will never start working; fail immediately.
+            raise
+        except requests.exceptions.RequestException:
+            pass
+        if time.time() >= deadline:
+            raise RuntimeError(
+                "syncstorage did not start within {} seconds".format(timeout))
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
 
 if __name__ == "__main__":
     # When run as a script, this file will execute the
     # functional tests against a live webserver.
+    # Options such as -x or --config-file may precede the server URL, so
+    # find it the same way run_live_functional_tests will.
+    _, args = get_option_parser().parse_args(sys.argv)
+    server_url = args[1] if len(args) > 1 else DEFAULT_URL
+
     target_binary = None
     if os.path.exists(DEBUG_BUILD):
         target_binary = DEBUG_BUILD
@@ -23,8 +66,6 @@ if __name__ == "__main__":
     else:
         raise RuntimeError("Neither target/debug/syncstorage nor /app/bin/syncstorage were found.")
     the_server_subprocess = subprocess.Popen('SYNC_MASTER_SECRET=secret0 ' + target_binary, shell=True)
-    ## TODO we should change this to watch for a log message on startup to know when to continue instead of sleeping for a fixed amount
-    time.sleep(20)
 
     def stop_subprocess():
         the_server_subprocess.terminate()
@@ -32,5 +73,7 @@ if __name__ == "__main__":
 
     atexit.register(stop_subprocess)
 
+    wait_for_server(the_server_subprocess, server_url)
+
     res = run_live_functional_tests(TestStorage, sys.argv)
     sys.exit(res)
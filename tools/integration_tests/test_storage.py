@@ -67,7 +67,7 @@ _ASCII = string.ascii_letters + string.digits
 
 
 def randtext(size=10):
-    return ''.join([random.choice(_ASCII) for i in range(size)])
+    return ''.join(random.choices(_ASCII, k=size))
 
 
 class TestStorage(StorageFunctionalTestCase):
@@ -88,7 +88,9 @@ class Secrets(object):
 
     def add(self, node, size=256):
         timestamp = str(int(time.time()))
-        secret = binascii.b2a_hex(os.urandom(size))[:size]
+        # Each random byte hex-encodes to two characters, so only read
+        # as much entropy as the truncated secret actually uses.
+        secret = binascii.b2a_hex(os.urandom((size + 1) // 2))[:size]
         # The new secret *must* sort at the end of the list.
         # This forbids you from adding multiple secrets per second.
         try:
@@ -784,15 +786,8 @@ class SyncStorageAuthenticationPolicy(TokenServerAuthenticationPolicy):
         return user
 
 
-def run_live_functional_tests(TestCaseClass, argv=None):
-    """Execute the given suite of testcases against a live server."""
-    if argv is None:
-        argv = sys.argv
-
-    # This will only work using a StorageFunctionalTestCase subclass,
-    # since we override the _authenticate() method.
-    assert issubclass(TestCaseClass, StorageFunctionalTestCase)
-
+def get_option_parser():
+    """Build the command-line parser used by run_live_functional_tests."""
     usage = "Usage: %prog [options] <server-url>"
     parser = optparse.OptionParser(usage=usage)
     parser.add_option("-x", "--failfast", action="store_true",
@@ -805,7 +800,19 @@ def run_live_functional_tests(TestCaseClass, argv=None):
                       help="email address to use for tokenserver tests")
     parser.add_option("", "--audience",
                       help="assertion audience to use for tokenserver tests")
+    return parser
+
+
+def run_live_functional_tests(TestCaseClass, argv=None):
+    """Execute the given suite of testcases against a live server."""
+    if argv is None:
+        argv = sys.argv
+
+    # This will only work using a StorageFunctionalTestCase subclass,
+    # since we override the _authenticate() method.
+    assert issubclass(TestCaseClass, StorageFunctionalTestCase)
 
+    parser = get_option_parser()
     try:
         opts, args = parser.parse_args(argv)
     except SystemExit as e:
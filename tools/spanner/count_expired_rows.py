@@ -5,6 +5,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import functools
 import os
 import sys
 import logging
@@ -20,10 +21,8 @@ logging.basicConfig(
     stream=sys.stdout,
     level=logging.INFO)
 
-# Change these to match your install.
-client = spanner.Client()
-
 
+@functools.lru_cache(maxsize=1)
 def from_env():
     try:
         url = os.environ.get("SYNC_DATABASE_URL")
@@ -42,7 +41,7 @@ def from_env():
     return (instance_id, database_id)
 
 
-def spanner_read_data(query, table):
+def spanner_read_data(client, query, table):
     (instance_id, database_id) = from_env()
     instance = client.instance(instance_id)
     database = instance.database(database_id)
@@ -61,8 +60,9 @@ def spanner_read_data(query, table):
 if __name__ == "__main__":
     logging.info('Starting count_expired_rows.py')
 
+    client = spanner.Client()
     for table in ['batches', 'bsos']:
         query = f'SELECT COUNT(*) FROM {table} WHERE expiry < CURRENT_TIMESTAMP()'
-        spanner_read_data(query, table)
+        spanner_read_data(client, query, table)
 
     logging.info('Completed count_expired_rows.py')
@@ -20,9 +20,6 @@ logging.basicConfig(
     stream=sys.stdout,
     level=logging.INFO)
 
-# Change these to match your install.
-client = spanner.Client()
-
 
 def from_env():
     try:
@@ -44,6 +41,7 @@ def from_env():
 
 def spanner_read_data(request=None):
     (instance_id, database_id) = from_env()
+    client = spanner.Client()
     instance = client.instance(instance_id)
     database = instance.database(database_id)
 
@@ -8,7 +8,8 @@ import argparse
 import logging
 import os
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import List, Optional
 from urllib import parse
 
@@ -23,9 +24,6 @@ logging.basicConfig(
     stream=sys.stdout,
     level=logging.INFO)
 
-# Change these to match your install.
-client = spanner.Client()
-
 
 def use_dsn(args):
     try:
@@ -50,16 +48,21 @@ def deleter(database: Database,
         params: Optional[dict]=None,
         param_types: Optional[dict]=None,
         dryrun: Optional[bool]=False):
-    with statsd.timer("syncstorage.purge_ttl.{}_duration".format(name)):
-        logging.info("Running: {} :: {}".format(query, params))
-        start = datetime.now()
-        result = 0
+    logging.info("Running: {} :: {}".format(query, params))
+    start = time.perf_counter()
+    result = 0
+    try:
         if not dryrun:
             result = database.execute_partitioned_dml(query, params=params, param_types=param_types)
-        end = datetime.now()
-        logging.info(
-            "{name}: removed {result} rows, {name}_duration: {time}, prefix: {prefix}".format(
-                name=name, result=result, time=end - start, prefix=prefix))
+    finally:
+        duration = time.perf_counter() - start
+        # Report the same measurement to statsd and the log line rather than
+        # timing the call twice. Sent even if the delete fails, as
+        # statsd.timer did.
+        statsd.timing("syncstorage.purge_ttl.{}_duration".format(name), duration * 1000)
+    logging.info(
+        "{name}: removed {result} rows, {name}_duration: {time}, prefix: {prefix}".format(
+            name=name, result=result, time=timedelta(seconds=duration), prefix=prefix))
 
 
 def add_conditions(args, query: str, prefix: Optional[str]):
@@ -109,6 +112,9 @@ def get_expiry_condition(args):
 
 
 def spanner_purge(args):
+    # Created here rather than at import time so that `--help` and argument
+    # errors don't pay for resolving credentials and building the client.
+    client = spanner.Client()
     instance = client.instance(args.instance_id)
     database = instance.database(args.database_id)
     expiry_condition = get_expiry_condition(args)
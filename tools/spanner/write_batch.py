@@ -7,23 +7,38 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import base64
+import functools
 import os
 from urllib import parse
 
-import random
-import string
+import time
 import uuid
 from datetime import datetime, timedelta
 
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-from google.api_core.exceptions import AlreadyExists
 from google.cloud import spanner
+from google.cloud.spanner_v1.pool import PingingPool
 from google.cloud.spanner_v1 import param_types
 
 
-# max batch size for this write is 2000, otherwise we run into:
+# Each batch is inserted with a single DML statement that binds the payload
+# once, so the request message stays small. The commit itself is still
+# limited by the total bytes written (BATCH_SIZE * PAYLOAD_SIZE has to stay
+# under 100 MiB) and by the mutation count (columns written per row, plus
+# index changes; 8 * BATCH_SIZE here, which must stay under the current
+# 80000 limit rather than the 20000 quoted below), otherwise we run into:
 """google.api_core.exceptions.InvalidArgument: 400 The transaction
+exceeds the maximum total bytes-size that can be handled by
+Spanner. Please reduce the size or number of the writes, or use fewer
+indexes. (Maximum size: 104857600)
+
+or
+
+google.api_core.exceptions.InvalidArgument: 400 The transaction
 contains too many mutations. Insert and update operations count with
 the multiplicity of the number of columns they affect. For example,
 inserting values into one key column and four non-key columns count as
@@ -33,26 +48,20 @@ affected. The total mutation count includes any changes to indexes
 that the transaction generates. Please reduce the number of writes, or
 use fewer indexes. (Maximum number: 20000)
 
-or
-
-google.api_core.exceptions.ResourceExhausted: 429 Received message
-larger than max (1000422248 vs. 104857600)
-
-or
-
-google.api_core.exceptions.InvalidArgument: 400 The transaction
-exceeds the maximum total bytes-size that can be handled by
-Spanner. Please reduce the size or number of the writes, or use fewer
-indexes. (Maximum size: 104857600)
-
 """
-# 1 Batch of 2K records with payload of 25K = 201_168_000B
-# so, ~300G would need 2_982_582 batches
-BATCH_SIZE = 2000
+# 1 Batch of 3.5K records with payload of 25K = 87_500_000B of payload
+BATCH_SIZE = 3500
 # Total number of threads to use
 THREAD_COUNT = 16
-# Number of batches per thread
-BATCHES = 330
+# Number of batches per thread (the same ~660K records per thread as
+# 330 batches of 2000)
+BATCHES = 330 * 2000 // BATCH_SIZE
+# Number of batch commits each thread may have outstanding at once
+MAX_INFLIGHT = 4
+# Print loader progress once per this many batches
+LOG_INTERVAL = 32
+# Seconds a pooled session may sit idle before it is pinged
+PING_INTERVAL = 300
 
 # `100` is the bottom limit for reserved collections.
 COLL_ID = 100
@@ -69,95 +78,85 @@ size or number of the writes, or use fewer indexes. (Maximum size: 104857600)
 PAYLOAD_SIZE = 25000
 # fake a base64 like payload. Not strictly neccessary, but may help ML
 # routines.
-PAYLOAD = ''.join(
-    random.choice(
-        string.digits + string.ascii_uppercase + string.ascii_lowercase + "-_="
+PAYLOAD = base64.urlsafe_b64encode(
+    os.urandom((PAYLOAD_SIZE * 3 + 3) // 4)
+).decode('ascii')[:PAYLOAD_SIZE]
+
+# Insert a whole batch with one DML statement. Only the bso_id differs
+# between records, so it is the only array parameter; every other column is
+# bound once as a scalar rather than repeated for each record.
+INSERT_BSOS = """\
+    INSERT INTO bsos
+        (fxa_uid, fxa_kid, collection_id, bso_id, sortindex, payload,
+         modified, expiry)
+    SELECT @fxa_uid, @fxa_kid, @collection_id, bso_id, NULL, @payload,
+           @modified, @expiry
+    FROM UNNEST(@bso_ids) AS bso_id
+    """
+INSERT_BSOS_TYPES = dict(
+    fxa_uid=param_types.STRING,
+    fxa_kid=param_types.STRING,
+    collection_id=param_types.INT64,
+    payload=param_types.STRING,
+    modified=param_types.TIMESTAMP,
+    expiry=param_types.TIMESTAMP,
+    bso_ids=param_types.Array(param_types.STRING),
+)
+
+
+def insert_batch(txn, params):
+    txn.execute_update(
+        INSERT_BSOS,
+        params=params,
+        param_types=INSERT_BSOS_TYPES
     )
-    for _ in range(PAYLOAD_SIZE))
 
 
-def load(instance, db, coll_id, name):
+def load(db, coll_id, name):
     fxa_uid = "DEADBEEF" + uuid.uuid4().hex[8:]
     fxa_kid = "{:013d}-{}".format(22, fxa_uid)
     print("{} -> Loading {} {}".format(name, fxa_uid, fxa_kid))
-    name = threading.current_thread().getName()
-    spanner_client = spanner.Client()
-    instance = spanner_client.instance(instance)
-    db = instance.database(db)
     print('{name} Db: {db}'.format(name=name, db=db))
     start = datetime.now()
+    started = time.perf_counter()
 
-    def create_user(txn):
-        txn.execute_update(
-            """\
-            INSERT INTO user_collections
-                (fxa_uid, fxa_kid, collection_id, modified)
-            VALUES (@fxa_uid, @fxa_kid, @collection_id, @modified)
-            """,
-            params=dict(
-                fxa_uid=fxa_uid,
-                fxa_kid=fxa_kid,
-                collection_id=coll_id,
-                modified=start
-            ),
-            param_types=dict(
-                fxa_uid=param_types.STRING,
-                fxa_kid=param_types.STRING,
-                collection_id=param_types.INT64,
-                modified=param_types.TIMESTAMP
-            )
+    # A single upsert mutation commits in one request, and an existing row
+    # for this user is simply overwritten.
+    with db.batch() as batch:
+        batch.insert_or_update(
+            table='user_collections',
+            columns=('fxa_uid', 'fxa_kid', 'collection_id', 'modified'),
+            values=[(fxa_uid, fxa_kid, coll_id, start)]
         )
+    print('{name} Created user (fxa_uid: {uid}, fxa_kid: {kid})'.format(
+        name=name, uid=fxa_uid, kid=fxa_kid))
 
-    try:
-        db.run_in_transaction(create_user)
-        print('{name} Created user (fxa_uid: {uid}, fxa_kid: {kid})'.format(
-            name=name, uid=fxa_uid, kid=fxa_kid))
-    except AlreadyExists:
-        print('{name} Existing user (fxa_uid: {uid}}, fxa_kid: {kid}})'.format(
-              name=name, uid=fxa_uid, kid=fxa_kid))
-
-    # approximately 1892 bytes
-    rlen = 0
+    batch_params = dict(
+        fxa_uid=fxa_uid,
+        fxa_kid=fxa_kid,
+        collection_id=coll_id,
+        payload=PAYLOAD,
+        modified=start,
+        expiry=start + timedelta(days=365 * 5)
+    )
+    # Only the bso_id differs between records, and its length is fixed, so
+    # the approximate record size only needs to be calculated once.
+    rlen = len(fxa_kid) * 4
+    rlen += 64
+    rlen += 32 * 4
+    rlen += 64
+    rlen += len(PAYLOAD) * 4
+    rlen += 64
+    rlen += 64
 
-    print('{name} Loading..'.format(name=name))
-    for j in range(BATCHES):
-        records = []
-        for i in range(BATCH_SIZE):
-            # create a record
-            record = (
-                fxa_uid,
-                fxa_kid,
-                coll_id,
-                str(uuid.uuid4()),
-                None,
-                PAYLOAD,
-                start,
-                start + timedelta(days=365 * 5)
-            )
-            # determine it's size.
-            rlen = len(record[1]) * 4
-            rlen += 64
-            rlen += len(record[3]) * 4
-            rlen += 64
-            rlen += len(record[5]) * 4
-            rlen += 64
-            rlen += 64
-            records.append(record)
-        with db.batch() as batch:
-            batch.insert(
-                table='bsos',
-                columns=(
-                    'fxa_uid',
-                    'fxa_kid',
-                    'collection_id',
-                    'bso_id',
-                    'sortindex',
-                    'payload',
-                    'modified',
-                    'expiry'
-                ),
-                values=records
-            )
+    def wrote_batch(j, commit):
+        # Wait for the commit to land (re-raising any error) before
+        # reporting it. Progress is only printed every LOG_INTERVAL batches,
+        # since every print contends for the stdout lock with all the other
+        # loader threads.
+        commit.result()
+        if j % LOG_INTERVAL and j + 1 != BATCHES:
+            return
         print(
             ('{name} Wrote batch {b} of {bb}:'
              ' {c} records {r} bytes, {t}').format(
@@ -166,26 +165,54 @@ def load(instance, db, coll_id, name):
                 bb=BATCHES,
                 c=BATCH_SIZE,
                 r=rlen,
-                t=datetime.now() - start))
+                t=timedelta(seconds=time.perf_counter() - started)))
+
+    print('{name} Loading..'.format(name=name))
+    # Commit batches in the background so the next batch can be built while
+    # earlier ones are still in flight, up to MAX_INFLIGHT at a time.
+    pending = deque()
+    with ThreadPoolExecutor(
+            max_workers=MAX_INFLIGHT,
+            thread_name_prefix=name) as committer:
+        for j in range(BATCHES):
+            # Read the randomness for every bso_id in the batch at once.
+            ids = os.urandom(16 * BATCH_SIZE).hex()
+            params = dict(
+                batch_params,
+                bso_ids=[ids[i:i + 32] for i in range(0, len(ids), 32)]
+            )
+            if len(pending) >= MAX_INFLIGHT:
+                wrote_batch(*pending.popleft())
+            pending.append(
+                (j, committer.submit(
+                    db.run_in_transaction, insert_batch, params)))
+        while pending:
+            wrote_batch(*pending.popleft())
     print('{name} Total: {t} (count: {c}, size: {s} in {sec})'.format(
         name=name,
         t=BATCHES,
         c=BATCHES * BATCH_SIZE,
         s=BATCHES * BATCH_SIZE * rlen,
-        sec=datetime.now() - start
+        sec=timedelta(seconds=time.perf_counter() - started)
     ))
 
 
-def from_env():
+@functools.lru_cache(maxsize=1)
+def ids_from_env():
+    """Return the (instance_id, database_id) to load into.
+
+    The environment is only read once; later calls return the same ids.
+    """
     try:
         url = os.environ.get("SYNC_DATABASE_URL")
         if not url:
             raise Exception("no url")
         purl = parse.urlparse(url)
-        if purl.scheme == "spanner":
-            path = purl.path.split("/")
-            instance_id = path[-3]
-            database_id = path[-1]
+        if purl.scheme != "spanner":
+            raise Exception("not a spanner url: {}".format(url))
+        path = purl.path.split("/")
+        instance_id = path[-3]
+        database_id = path[-1]
     except Exception as e:
         # Change these to reflect your Spanner instance install
         print("Exception {}".format(e))
@@ -194,23 +221,44 @@ def from_env():
     return (instance_id, database_id)
 
 
-def loader():
+def loader(db):
     # Prefix uaids for easy filtering later
     # Each loader thread gets it's own fake user to prevent some hotspot
     # issues.
-    (instance_id, database_id) = from_env()
     # switching uid/kid to per load because of weird google trimming
     name = threading.current_thread().getName()
-    load(instance_id, database_id, COLL_ID, name)
+    load(db, COLL_ID, name)
+
+
+def ping_sessions(pool):
+    # Keep idle sessions in the shared pool alive between batches.
+    while True:
+        pool.ping()
+        time.sleep(PING_INTERVAL / 10)
 
 
 def main():
-    for c in range(THREAD_COUNT):
-        print("Starting thread {}".format(c))
-        t = threading.Thread(
-            name="loader_{}".format(c),
-            target=loader)
-        t.start()
+    (instance_id, database_id) = ids_from_env()
+    # All loader threads share one client (and so one set of gRPC
+    # channels) and one session pool, rather than each creating their own.
+    spanner_client = spanner.Client()
+    pool = PingingPool(
+        size=THREAD_COUNT * MAX_INFLIGHT,
+        default_timeout=30,
+        ping_interval=PING_INTERVAL)
+    db = spanner_client.instance(instance_id).database(database_id, pool=pool)
+    threading.Thread(
+        name="ping_sessions",
+        target=ping_sessions,
+        args=(pool,),
+        daemon=True).start()
+
+    print("Starting {} threads".format(THREAD_COUNT))
+    with ThreadPoolExecutor(
+            max_workers=THREAD_COUNT,
+            thread_name_prefix="loader") as executor:
+        # Wait for every loader to finish, re-raising the first failure.
+        list(executor.map(lambda _: loader(db), range(THREAD_COUNT)))
 
 
 if __name__ == '__main__':